@@ -0,0 +1,173 @@
+import os
+import struct
+import sys
+import time
+import smbus2
+import threading
+
+# Numba JIT-compiles the fixed-point compensation math to native code when
+# available; fall back to plain Python so the app still runs without it
+try:
+    from numba import njit
+except ImportError:
+    def njit(func):
+        return func
+
+# Sensor selection: SMARTCLOCK_SENSOR env var wins, then an interactive prompt
+# on a real terminal; headless launches (systemd/cron) get the default instantly
+# instead of stalling on stdin
+def get_sensor_choice(default='aht10', timeout=20):
+    sensor = os.environ.get('SMARTCLOCK_SENSOR')
+    if sensor:
+        return sensor.strip().lower()
+    if not sys.stdin.isatty():
+        return default
+
+    print(f"Which sensor is connected? (bmp280/aht10) [Default: {default}]")
+    sensor = None
+
+    def ask():
+        nonlocal sensor
+        sensor = input().strip().lower() or default
+
+    thread = threading.Thread(target=ask)
+    thread.daemon = True  # Daemonize thread to ensure it exits if main thread exits
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        print(f"No input received. Defaulting to {default}.")
+        return default
+    return sensor
+
+# Use the I2C bus (bus 0 corresponds to GPIO0 and GPIO1)
+bus = smbus2.SMBus(0)  # '0' refers to the I2C0 bus
+
+# BMP280 I2C address
+BMP280_I2C_ADDR = 0x76
+
+# AHT10 I2C address
+AHT10_I2C_ADDR = 0x38
+
+# BMP280 functions
+def read_block_bmp280(reg, length):
+    # Combined write-register + read transaction with a repeated start, which
+    # skips the STOP/START pair that read_i2c_block_data pays between segments
+    write = smbus2.i2c_msg.write(BMP280_I2C_ADDR, [reg])
+    read = smbus2.i2c_msg.read(BMP280_I2C_ADDR, length)
+    bus.i2c_rdwr(write, read)
+    return list(read)
+
+def read_calibration_data_bmp280():
+    # Burst-read the whole T/P calibration block (0x88-0x9F) in one I2C
+    # transaction instead of 24 separate byte reads. The registers are
+    # little-endian int16s, and per the datasheet all of them except dig_T1
+    # and dig_P1 are signed
+    calib = read_block_bmp280(0x88, 24)
+    return struct.unpack('<HhhHhhhhhhhh', bytes(calib))
+
+BMP280_REG_STATUS = 0xF3
+BMP280_REG_CTRL_MEAS = 0xF4
+# Forced mode with x1 temperature and pressure oversampling; the sensor sleeps
+# between samples instead of free-running, which also limits self-heating
+BMP280_CTRL_MEAS_FORCED = 0x25
+
+def trigger_measurement_bmp280():
+    # Kick off one conversion and wait for the measuring bit to clear; without
+    # this the device can sit in sleep mode returning stale data
+    bus.write_byte_data(BMP280_I2C_ADDR, BMP280_REG_CTRL_MEAS, BMP280_CTRL_MEAS_FORCED)
+    while read_block_bmp280(BMP280_REG_STATUS, 1)[0] & 0x08:
+        time.sleep(0.002)
+
+def read_raw_data_bmp280():
+    # Burst-read press_msb..temp_xlsb (0xF7-0xFC) in one transaction, which is
+    # the datasheet-recommended way to get pressure and temperature from the
+    # same conversion cycle
+    data = read_block_bmp280(0xF7, 6)
+    raw_press = (data[0] << 12) | (data[1] << 4) | (data[2] >> 4)
+    raw_temp = (data[3] << 12) | (data[4] << 4) | (data[5] >> 4)
+    return raw_temp, raw_press
+
+@njit
+def compensate_temperature_bmp280(adc_T, calib):
+    dig_T1, dig_T2, dig_T3 = calib[:3]
+
+    var1 = ((((adc_T >> 3) - (dig_T1 << 1))) * (dig_T2)) >> 11
+    var2 = (((((adc_T >> 4) - (dig_T1)) * ((adc_T >> 4) - (dig_T1))) >> 12) * (dig_T3)) >> 14
+
+    t_fine = var1 + var2
+    T = (t_fine * 5 + 128) >> 8
+
+    return T / 100.0, t_fine
+
+@njit
+def compensate_pressure_bmp280(adc_P, calib, t_fine):
+    dig_P1, dig_P2, dig_P3, dig_P4, dig_P5, dig_P6, dig_P7, dig_P8, dig_P9 = calib[3:]
+
+    var1 = (t_fine) - 128000
+    var2 = var1 * var1 * dig_P6
+    var2 = var2 + ((var1 * dig_P5) << 17)
+    var2 = var2 + ((dig_P4) << 35)
+    var1 = ((var1 * var1 * dig_P3) >> 8) + ((var1 * dig_P2) << 12)
+    var1 = (((1 << 47) + var1) * (dig_P1)) >> 33
+
+    if var1 == 0:
+        return 0  # Avoid division by zero
+
+    P = 1048576 - adc_P
+    P = (((P << 31) - var2) * 3125) // var1
+    var1 = ((dig_P9) * (P >> 13) * (P >> 13)) >> 25
+    var2 = ((dig_P8) * P) >> 19
+
+    P = ((P + var1 + var2) >> 8) + ((dig_P7) << 4)
+    return P / 25600.0
+
+# AHT10 functions
+def initialize_aht10():
+    bus.write_byte(AHT10_I2C_ADDR, 0xE1)  # Soft reset
+    time.sleep(0.04)
+    # Send the init command and its mode byte in one transaction with a single
+    # coalesced wait instead of two writes with two waits
+    bus.write_i2c_block_data(AHT10_I2C_ADDR, 0xA8, [0x33])
+    time.sleep(0.04)
+
+# Scale factors for the 20-bit AHT10 fields, precomputed so each read is a
+# single multiply instead of a multiply plus a divide
+AHT10_HUM_SCALE = 100 / 1048576.0
+AHT10_TEMP_SCALE = 200 / 1048576.0
+
+def read_data_aht10():
+    bus.write_byte(AHT10_I2C_ADDR, 0xAC)
+    time.sleep(0.08)
+    data = bus.read_i2c_block_data(AHT10_I2C_ADDR, 0x00, 6)
+
+    # Bytes 1-5 hold a 40-bit field: 20 bits of humidity then 20 of temperature
+    raw = int.from_bytes(bytes(data[1:6]), 'big')
+    humidity = (raw >> 20) * AHT10_HUM_SCALE
+    temperature = (raw & 0xFFFFF) * AHT10_TEMP_SCALE - 50
+
+    return temperature, humidity
+
+def get_read_sensor(sensor_choice):
+    """Initialize the selected sensor and return its read function.
+
+    The returned function yields (temperature, pressure) for the BMP280 and
+    (temperature, humidity) for the AHT10.
+    """
+    if sensor_choice == 'bmp280':
+        # Calibration constants are factory-programmed and never change, so read
+        # them once at startup instead of on every refresh
+        calib = read_calibration_data_bmp280()
+
+        def read_sensor():
+            trigger_measurement_bmp280()
+            raw_temp, raw_press = read_raw_data_bmp280()
+            temp_celsius, t_fine = compensate_temperature_bmp280(raw_temp, calib)
+            press_hpa = compensate_pressure_bmp280(raw_press, calib, t_fine)
+            return temp_celsius, press_hpa
+    else:  # Default to AHT10
+        initialize_aht10()
+
+        def read_sensor():
+            return read_data_aht10()
+
+    return read_sensor